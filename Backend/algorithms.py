@@ -3,7 +3,7 @@ Maximum Flow Algorithms
 Implements Edmonds-Karp and Dinic's algorithms
 """
 import random
-from typing import Dict, Tuple
+from typing import Dict, List, Optional, Tuple
 
 # Graph topology
 NODES = ["A", "B", "C", "D", "E", "F", "G", "H", "T"]
@@ -20,90 +20,292 @@ EDGES = [
 # Constants
 MIN_CAPACITY = 5
 MAX_CAPACITY = 15
+CAPACITY_RANGE = range(MIN_CAPACITY, MAX_CAPACITY + 1)
 
 
 def generate_random_capacity_graph() -> Dict[str, Dict[str, int]]:
     """Generate a random capacity graph"""
     g = {u: {} for u in NODES}
-    for u, v in EDGES:
-        capacity = random.randint(MIN_CAPACITY, MAX_CAPACITY)
+    # Draw every edge's capacity in one call rather than one randint per edge
+    capacities = random.choices(CAPACITY_RANGE, k=len(EDGES))
+    for (u, v), capacity in zip(EDGES, capacities):
         g[u][v] = capacity
     return g
 
 
-def edmonds_karp_with_flows(graph: Dict, source: str, sink: str) -> Tuple[int, Dict]:
+def _build_residual(graph: Dict) -> Tuple[Dict[str, int], List[int], List[int], List[int], List[int], List[int]]:
     """
-    Edmonds-Karp algorithm returning max flow and flow dictionary
+    Number the nodes of a graph and build its residual graph as flat lists
+    
+    Each pair of residual edges is stored at 2p (forward) and 2p + 1
+    (reverse), so the reverse of edge e is e ^ 1. An input edge u->v whose
+    opposite v->u already has a pair is coalesced into that pair's reverse
+    slot: a single pair of residual edges represents all edges between u
+    and v, and the max-flow value is unchanged.
+    head[u] is the first edge leaving node u, nxt[e] the next edge leaving
+    the same node (-1 ends the list) and to[e] the node edge e points at.
     
     Args:
         graph: Adjacency list with capacities
-        source: Source node
-        sink: Sink node
     
     Returns:
-        Tuple of (max_flow, flow_dict) where flow_dict maps (u,v) -> flow
+        Tuple of (index, head, nxt, to, cap, slot) where index maps
+        node -> int and slot[k] is the residual edge of input edge k
     """
-    # Create residual graph
-    residual = {u: dict(neighbors) for u, neighbors in graph.items()}
-    flow_dict = {}
-    
-    # Initialize flow dictionary
-    for u in graph:
-        for v in graph[u]:
-            flow_dict[(u, v)] = 0
-    
-    def bfs_find_path():
-        """BFS to find augmenting path"""
-        queue = [(source, [source])]
-        visited = {source}
-        
-        while queue:
-            node, path = queue.pop(0)
+    # Number the graph's keys in one pass, then append the sinks that only
+    # appear as edge targets
+    index = {u: i for i, u in enumerate(graph)}
+    m = 0
+    for neighbors in graph.values():
+        m += 2 * len(neighbors)
+        for v in neighbors:
+            if v not in index:
+                index[v] = len(index)
+    
+    n = len(index)
+    head = [-1] * n
+    nxt = [-1] * m
+    to = [0] * m
+    cap = [0] * m
+    slot = []
+    pairs = {}
+    
+    e = 0
+    for u, neighbors in graph.items():
+        iu = index[u]
+        for v, capacity in neighbors.items():
+            iv = index[v]
             
-            if node == sink:
-                return path
+            # v->u already owns a pair: u->v is its reverse edge
+            rev = pairs.get(iv * n + iu)
+            if rev is not None:
+                cap[rev + 1] += capacity
+                slot.append(rev + 1)
+                continue
             
-            if node in residual:
-                for neighbor, capacity in residual[node].items():
-                    if neighbor not in visited and capacity > 0:
-                        visited.add(neighbor)
-                        queue.append((neighbor, path + [neighbor]))
+            pairs[iu * n + iv] = e
+            to[e], cap[e], nxt[e] = iv, capacity, head[iu]
+            head[iu] = e
+            to[e + 1], nxt[e + 1] = iu, head[iv]
+            head[iv] = e + 1
+            slot.append(e)
+            e += 2
+    
+    if e < m:
+        del nxt[e:], to[e:], cap[e:]
+    
+    return index, head, nxt, to, cap, slot
+
+
+def _out_capacity(head: List[int], nxt: List[int], cap: List[int], u: int) -> int:
+    """Total residual capacity leaving node u"""
+    total = 0
+    e = head[u]
+    while e != -1:
+        total += cap[e]
+        e = nxt[e]
+    return total
+
+
+def _bfs_augmenting_path(head: List[int], nxt: List[int], to: List[int], cap: List[int],
+                         s: int, t: int, parent_edge: List[int], queue: List[int],
+                         floor: int = 0) -> bool:
+    """BFS for a shortest s-t path over edges with more than floor capacity left"""
+    # Visited nodes are bits of a single int. Each node is queued at most
+    # once, so queue (length n) is used as a plain array with read/write
+    # cursors.
+    visited = 1 << s
+    queue[0] = s
+    qhead, qtail = 0, 1
+    
+    while qhead < qtail:
+        u = queue[qhead]
+        qhead += 1
         
-        return None
+        e = head[u]
+        while e != -1:
+            v = to[e]
+            if cap[e] > floor and not (visited >> v) & 1:
+                visited |= 1 << v
+                parent_edge[v] = e
+                if v == t:
+                    return True
+                queue[qtail] = v
+                qtail += 1
+            e = nxt[e]
     
+    return False
+
+
+def _augment(to: List[int], cap: List[int], s: int, t: int,
+             parent_edge: List[int], limit: int) -> int:
+    """Push the bottleneck along the path found by BFS, returning it"""
+    # Find minimum capacity along path
+    flow = limit
+    v = t
+    while v != s:
+        e = parent_edge[v]
+        if cap[e] < flow:
+            flow = cap[e]
+        v = to[e ^ 1]
+    
+    # Update residual graph
+    v = t
+    while v != s:
+        e = parent_edge[v]
+        cap[e] -= flow
+        cap[e ^ 1] += flow
+        v = to[e ^ 1]
+    
+    return flow
+
+
+def _ek_core(head: List[int], nxt: List[int], to: List[int], cap: List[int], s: int, t: int) -> int:
+    """Run Edmonds-Karp on a residual graph from _build_residual, updating cap in place"""
+    n = len(head)
+    parent_edge = [-1] * n
+    queue = [0] * n
     max_flow = 0
     
-    while True:
-        path = bfs_find_path()
-        if not path:
+    # No path can carry more than leaves s, so this int bounds every
+    # bottleneck and keeps the arithmetic free of floats
+    limit = _out_capacity(head, nxt, cap, s)
+    
+    while _bfs_augmenting_path(head, nxt, to, cap, s, t, parent_edge, queue):
+        max_flow += _augment(to, cap, s, t, parent_edge, limit)
+    
+    return max_flow
+
+
+def _ek_scaling_core(head: List[int], nxt: List[int], to: List[int], cap: List[int], s: int, t: int) -> int:
+    """Run capacity-scaling Edmonds-Karp on a residual graph, updating cap in place"""
+    n = len(head)
+    parent_edge = [-1] * n
+    queue = [0] * n
+    max_flow = 0
+    limit = _out_capacity(head, nxt, cap, s)
+    
+    # Start at the largest power of two not above the biggest capacity and
+    # only augment along edges with at least delta left (more than
+    # delta - 1, capacities being integers), halving delta once no such
+    # path remains. The delta = 1 phase ends when no augmenting path is left.
+    delta = 1 << (max(cap, default=0).bit_length() - 1) if limit > 0 else 0
+    while delta:
+        while _bfs_augmenting_path(head, nxt, to, cap, s, t, parent_edge, queue, delta - 1):
+            max_flow += _augment(to, cap, s, t, parent_edge, limit)
+        delta >>= 1
+    
+    return max_flow
+
+
+def _bfs_levels(head: List[int], nxt: List[int], to: List[int], cap: List[int],
+                s: int, t: int, queue: List[int]) -> Optional[List[int]]:
+    """Build Dinic's level graph, returning None once t is unreachable"""
+    n = len(head)
+    level = [-1] * n
+    level[s] = 0
+    visited = 1 << s
+    queue[0] = s
+    qhead, qtail = 0, 1
+    t_level = n
+    
+    while qhead < qtail:
+        u = queue[qhead]
+        qhead += 1
+        
+        # Nodes come off the queue in level order; nothing at t's level or
+        # beyond can lie on a shortest path, so stop expanding there
+        if level[u] >= t_level:
             break
         
-        # Find minimum capacity along path
-        flow = float('inf')
-        for i in range(len(path) - 1):
-            u, v = path[i], path[i + 1]
-            flow = min(flow, residual[u][v])
+        e = head[u]
+        while e != -1:
+            v = to[e]
+            if cap[e] > 0 and not (visited >> v) & 1:
+                visited |= 1 << v
+                level[v] = level[u] + 1
+                if v == t:
+                    t_level = level[v]
+                queue[qtail] = v
+                qtail += 1
+            e = nxt[e]
+    
+    return level if (visited >> t) & 1 else None
+
+
+def _blocking_flow(nxt: List[int], to: List[int], cap: List[int], s: int, t: int,
+                   level: List[int], start: List[int], limit: int) -> int:
+    """Saturate the level graph using iterative DFS, returning the flow sent"""
+    # Each stack entry is (node, flow that can reach it along the path);
+    # path holds the edges between consecutive stack entries
+    stack = [(s, limit)]
+    path = []
+    total = 0
+    
+    while stack:
+        u, pushed = stack[-1]
         
-        # Update residual graph and flow
-        for i in range(len(path) - 1):
-            u, v = path[i], path[i + 1]
-            residual[u][v] -= flow
-            if v not in residual:
-                residual[v] = {}
-            residual[v][u] = residual[v].get(u, 0) + flow
+        if u == t:
+            total += pushed
+            cut = len(path)
+            for i, e in enumerate(path):
+                cap[e] -= pushed
+                cap[e ^ 1] += pushed
+                if cap[e] == 0 and i < cut:
+                    cut = i
             
-            # Track actual flow on original edges
-            if (u, v) in flow_dict:
-                flow_dict[(u, v)] += flow
+            # Keep the path up to the first saturated edge and continue the
+            # search from its tail instead of restarting at s
+            del path[cut:]
+            stack = [(v, reach - pushed) for v, reach in stack[:cut + 1]]
+            continue
         
-        max_flow += flow
+        # start[u] is u's current arc: edges before it are known dead
+        e = start[u]
+        while e != -1:
+            v = to[e]
+            if cap[e] > 0 and level[v] == level[u] + 1:
+                stack.append((v, min(pushed, cap[e])))
+                path.append(e)
+                break
+            e = nxt[e]
+        start[u] = e
+        
+        if e == -1:
+            # Dead end: retreat and skip the arc that led here
+            stack.pop()
+            if path:
+                e = path.pop()
+                start[to[e ^ 1]] = nxt[e]
     
-    return max_flow, flow_dict
+    return total
 
 
-def dinic(graph: Dict, source: str, sink: str) -> int:
+def _dinic_core(head: List[int], nxt: List[int], to: List[int], cap: List[int], s: int, t: int) -> int:
+    """Run Dinic's algorithm on a residual graph from _build_residual, updating cap in place"""
+    # With s == t the level graph is never empty and the DFS would stop on
+    # t at once, pushing 0 forever
+    if s == t:
+        return 0
+    
+    queue = [0] * len(head)
+    max_flow = 0
+    limit = _out_capacity(head, nxt, cap, s)
+    
+    while True:
+        level = _bfs_levels(head, nxt, to, cap, s, t, queue)
+        if not level:
+            break
+        
+        start = list(head)
+        max_flow += _blocking_flow(nxt, to, cap, s, t, level, start, limit)
+    
+    return max_flow
+
+
+def edmonds_karp(graph: Dict, source: str, sink: str) -> int:
     """
-    Dinic's algorithm for max flow
+    Edmonds-Karp algorithm for max flow
     
     Args:
         graph: Adjacency list with capacities
@@ -113,68 +315,73 @@ def dinic(graph: Dict, source: str, sink: str) -> int:
     Returns:
         Maximum flow value
     """
-    # Create residual graph
-    residual = {u: dict(neighbors) for u, neighbors in graph.items()}
+    index, head, nxt, to, cap, _ = _build_residual(graph)
+    if source not in index or sink not in index:
+        return 0
+    return _ek_core(head, nxt, to, cap, index[source], index[sink])
+
+
+def edmonds_karp_scaling(graph: Dict, source: str, sink: str) -> int:
+    """
+    Edmonds-Karp with capacity scaling for max flow
     
-    def bfs_level():
-        """Build level graph using BFS"""
-        level = {source: 0}
-        queue = [source]
-        
-        while queue:
-            u = queue.pop(0)
-            
-            if u in residual:
-                for v, cap in residual[u].items():
-                    if v not in level and cap > 0:
-                        level[v] = level[u] + 1
-                        queue.append(v)
-        
-        return level if sink in level else None
+    Augments along paths with large residual capacity first, which takes
+    far fewer BFS passes when capacities are large integers.
     
-    def dfs_flow(u, pushed, level, start):
-        """Send flow using DFS"""
-        if u == sink:
-            return pushed
-        
-        if u not in residual:
-            return 0
-        
-        while start[u] < len(list(residual[u].keys())):
-            neighbors = list(residual[u].keys())
-            if start[u] >= len(neighbors):
-                break
-                
-            v = neighbors[start[u]]
-            cap = residual[u][v]
-            
-            if v in level and level[v] == level[u] + 1 and cap > 0:
-                flow = dfs_flow(v, min(pushed, cap), level, start)
-                
-                if flow > 0:
-                    residual[u][v] -= flow
-                    if v not in residual:
-                        residual[v] = {}
-                    residual[v][u] = residual[v].get(u, 0) + flow
-                    return flow
-            
-            start[u] += 1
-        
+    Args:
+        graph: Adjacency list with integer capacities
+        source: Source node
+        sink: Sink node
+    
+    Returns:
+        Maximum flow value
+    """
+    index, head, nxt, to, cap, _ = _build_residual(graph)
+    if source not in index or sink not in index:
         return 0
+    return _ek_scaling_core(head, nxt, to, cap, index[source], index[sink])
+
+
+def edmonds_karp_with_flows(graph: Dict, source: str, sink: str) -> Tuple[int, Dict]:
+    """
+    Edmonds-Karp algorithm returning max flow and flow dictionary
     
-    max_flow = 0
+    Args:
+        graph: Adjacency list with capacities
+        source: Source node
+        sink: Sink node
     
-    while True:
-        level = bfs_level()
-        if not level:
-            break
-        
-        start = {node: 0 for node in graph}
-        
-        while True:
-            flow = dfs_flow(source, float('inf'), level, start)
-            if flow == 0:
-                break
-            max_flow += flow
+    Returns:
+        Tuple of (max_flow, flow_dict) where flow_dict maps (u,v) -> flow
+    """
+    index, head, nxt, to, cap, slot = _build_residual(graph)
+    
+    edges = [(u, v, c) for u in graph for v, c in graph[u].items()]
+    
+    if source not in index or sink not in index:
+        return 0, {(u, v): 0 for u, v, _ in edges}
     
-    return max_flow
\ No newline at end of file
+    max_flow = _ek_core(head, nxt, to, cap, index[source], index[sink])
+    
+    # Input edge k lives on residual edge slot[k]; whatever capacity it has
+    # lost is the flow sent along it (a coalesced pair only ever carries
+    # net flow one way, so the other direction reports 0)
+    return max_flow, {(u, v): max(0, c - cap[e]) for (u, v, c), e in zip(edges, slot)}
+
+
+def dinic(graph: Dict, source: str, sink: str) -> int:
+    """
+    Dinic's algorithm for max flow
+    
+    Args:
+        graph: Adjacency list with capacities
+        source: Source node
+        sink: Sink node
+    
+    Returns:
+        Maximum flow value
+    """
+    index, head, nxt, to, cap, _ = _build_residual(graph)
+    if source not in index or sink not in index:
+        return 0
+    return _dinic_core(head, nxt, to, cap, index[source], index[sink])
\ No newline at end of file
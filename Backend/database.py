@@ -203,28 +203,149 @@ Usage:
     from database import DatabaseManager
     db = DatabaseManager()  # default file: traffic_game.db
 """
+import queue
 import sqlite3
+import threading
 from typing import Dict, List, Optional
 from datetime import datetime
 import time
 import os
 
+# Size of the shared connection's prepared-statement cache. The queries below
+# are fixed strings, so each one is compiled once and then only re-bound.
+CACHED_STATEMENTS = 32
+
+# Most queued game results the background writer commits in one transaction.
+# Keeps a backlog from holding the connection lock for one long write.
+WRITE_BATCH_SIZE = 50
+
+# Largest value an SQLite INTEGER column can hold. Binding a bigger Python int
+# raises OverflowError rather than sqlite3.Error.
+SQLITE_MAX_INT = 2**63 - 1
+
+# Touch a returning player and fetch their id in one statement. An
+# INSERT ... ON CONFLICT upsert would also work but burns an AUTOINCREMENT
+# id on every conflict. RETURNING needs SQLite 3.35+.
+_TOUCH_PLAYER_SQL = """
+    UPDATE players SET last_played = CURRENT_TIMESTAMP
+    WHERE player_name = ?
+    RETURNING player_id
+"""
+_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+_INSERT_ROUND_SQL = "INSERT INTO game_rounds (round_number, graph_data) VALUES (?, ?)"
+_INSERT_ATTEMPT_SQL = """
+    INSERT INTO game_attempts (player_id, round_id, guess, correct_flow, is_correct)
+    VALUES (?, ?, ?, ?, ?)
+"""
+_INSERT_PERFORMANCE_SQL = """
+    INSERT INTO algorithm_performance (attempt_id, algorithm_name, execution_time_ms, flow_result)
+    VALUES (?, ?, ?, ?)
+"""
+
 class DatabaseManager:
     """Normalized database manager with automatic migration from old denormalized table."""
     def __init__(self, db_name: str = "traffic_game.db"):
         self.db_name = db_name
+        # A single connection is kept open for the lifetime of the manager.
+        # Flask serves requests from several threads, so every use of it is
+        # serialized through this lock.
+        self._lock = threading.Lock()
+        self._conn = self._connect()
         self.init_db()
 
+        # Game results queued by enqueue_game_result() are written by one
+        # background thread so request handlers don't wait on the commit.
+        self._write_queue = queue.Queue()
+        # flush() waits on this for the count of queued-but-unwritten results
+        # to reach zero, or for the writer thread to stop.
+        self._writes_done = threading.Condition()
+        self._pending_writes = 0
+        self._writer_stopped = False
+        self._writer = threading.Thread(target=self._writer_loop, name="db-writer", daemon=True)
+        self._writer.start()
+
     def _connect(self):
-        conn = sqlite3.connect(self.db_name, detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES)
+        # Autocommit mode: write paths open their own transaction with
+        # BEGIN IMMEDIATE so the write lock is taken up front.
+        conn = sqlite3.connect(self.db_name, detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES,
+                               check_same_thread=False, cached_statements=CACHED_STATEMENTS,
+                               isolation_level=None)
         conn.execute("PRAGMA foreign_keys = ON;")
+        # WAL lets readers (e.g. view_db.py) run alongside the writer, and
+        # NORMAL sync avoids an fsync on every commit.
+        conn.execute("PRAGMA journal_mode = WAL;")
+        conn.execute("PRAGMA synchronous = NORMAL;")
+        conn.execute("PRAGMA busy_timeout = 5000;")
+        conn.execute("PRAGMA temp_store = MEMORY;")
         return conn
 
+    def close(self):
+        """Write any queued results, stop the writer thread and close the connection."""
+        if self._writer.is_alive():
+            self._write_queue.put(None)
+            self._writer.join()
+        with self._lock:
+            self._conn.close()
+
+    def flush(self):
+        """Block until every queued game result has been written."""
+        # Also gives up if the writer thread has stopped, so readers can't
+        # hang on results that will never be written.
+        with self._writes_done:
+            self._writes_done.wait_for(lambda: not self._pending_writes or self._writer_stopped)
+
+    def _writer_loop(self):
+        try:
+            while True:
+                # Take what is already waiting (up to WRITE_BATCH_SIZE) so that
+                # rounds arriving close together are committed in one transaction.
+                batch = [self._write_queue.get()]
+                while len(batch) < WRITE_BATCH_SIZE:
+                    try:
+                        batch.append(self._write_queue.get_nowait())
+                    except queue.Empty:
+                        break
+                results = [item for item in batch if item is not None]
+                try:
+                    if results:
+                        with self._lock:
+                            self._write_game_results(results)
+                except Exception as e:
+                    # Already reported by _write_game_results. Retry one row at a
+                    # time so a single bad row doesn't lose the rest of the batch;
+                    # rows that still fail are dropped, never the writer thread.
+                    if len(results) == 1:
+                        print(f"✗ Dropped game result for {results[0][0]!r}: {e}")
+                    else:
+                        for result in results:
+                            try:
+                                with self._lock:
+                                    self._write_game_results([result])
+                            except Exception as e:
+                                print(f"✗ Dropped game result for {result[0]!r}: {e}")
+                finally:
+                    with self._writes_done:
+                        self._pending_writes -= len(results)
+                        self._writes_done.notify_all()
+                if len(results) != len(batch):
+                    return
+        finally:
+            # Wake flush() for good once this thread stops, however it stops
+            with self._writes_done:
+                self._writer_stopped = True
+                self._writes_done.notify_all()
+
     def init_db(self):
         """Initialize normalized schema and migrate from old schema if present."""
+        with self._lock:
+            self._init_db()
+
+    def _init_db(self):
+        conn = self._conn
         try:
-            conn = self._connect()
             cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
 
             # Create normalized tables if they don't exist
             cursor.execute("""
@@ -286,11 +407,11 @@ class DatabaseManager:
                     pass
 
             print("✓ Database (normalized) initialized successfully")
-        except sqlite3.Error as e:
+        except BaseException as e:
+            if conn.in_transaction:
+                conn.rollback()
             print(f"✗ Database initialization error: {e}")
             raise
-        finally:
-            conn.close()
 
     def _migrate_old_table(self, conn: sqlite3.Connection):
         """Migrate rows from old `game_results` table into the normalized schema.
@@ -302,6 +423,7 @@ class DatabaseManager:
 
         try:
             print("i) Detected old denormalized `game_results` table — starting migration...")
+            cursor.execute("BEGIN IMMEDIATE")
             # Read all rows from old table
             cursor.execute("""
                 SELECT id, player_name, guess, correct_flow, is_correct, ek_time_ms, dinic_time_ms, round_number, timestamp
@@ -312,18 +434,12 @@ class DatabaseManager:
 
             # Map player_name -> player_id
             player_cache: Dict[str, int] = {}
+            performance_rows = []
 
             def get_or_create_player_id(name: str) -> int:
                 if name in player_cache:
                     return player_cache[name]
-                cursor.execute("SELECT player_id FROM players WHERE player_name = ?", (name,))
-                res = cursor.fetchone()
-                if res:
-                    pid = res[0]
-                    cursor.execute("UPDATE players SET last_played = CURRENT_TIMESTAMP WHERE player_id = ?", (pid,))
-                else:
-                    cursor.execute("INSERT INTO players (player_name) VALUES (?)", (name,))
-                    pid = cursor.lastrowid
+                pid = self._get_or_create_player(cursor, name)
                 player_cache[name] = pid
                 return pid
 
@@ -352,88 +468,112 @@ class DatabaseManager:
                 ek_ms = ek_time_ms if ek_time_ms is not None else 0.0
                 dinic_ms = dinic_time_ms if dinic_time_ms is not None else 0.0
 
-                cursor.execute("""
-                    INSERT INTO algorithm_performance (attempt_id, algorithm_name, execution_time_ms, flow_result)
-                    VALUES (?, 'Edmonds-Karp', ?, ?)
-                """, (attempt_id, ek_ms, correct_flow))
-                cursor.execute("""
-                    INSERT INTO algorithm_performance (attempt_id, algorithm_name, execution_time_ms, flow_result)
-                    VALUES (?, 'Dinic', ?, ?)
-                """, (attempt_id, dinic_ms, correct_flow))
+                performance_rows.append((attempt_id, 'Edmonds-Karp', ek_ms, correct_flow))
+                performance_rows.append((attempt_id, 'Dinic', dinic_ms, correct_flow))
+
+            cursor.executemany(_INSERT_PERFORMANCE_SQL, performance_rows)
 
             # Rename old table for backup (do not DROP automatically)
             cursor.execute(f"ALTER TABLE game_results RENAME TO {backup_table}")
             conn.commit()
             print(f"✓ Migration complete — old table renamed to `{backup_table}`. Keep it until you verify data.")
-        except sqlite3.Error as e:
-            conn.rollback()
+        except BaseException as e:
+            if conn.in_transaction:
+                conn.rollback()
             print(f"✗ Migration failed: {e}")
             raise
 
     def get_or_create_player(self, player_name: str) -> int:
         """Get existing player_id or create new player (updates last_played)."""
-        conn = self._connect()
-        cursor = conn.cursor()
-        try:
-            cursor.execute("SELECT player_id FROM players WHERE player_name = ?", (player_name,))
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                player_id = self._get_or_create_player(cursor, player_name)
+                self._conn.commit()
+            except BaseException:
+                if self._conn.in_transaction:
+                    self._conn.rollback()
+                raise
+            return player_id
+
+    @staticmethod
+    def _get_or_create_player(cursor: sqlite3.Cursor, player_name: str) -> int:
+        if _HAS_RETURNING:
+            cursor.execute(_TOUCH_PLAYER_SQL, (player_name,))
             result = cursor.fetchone()
             if result:
-                player_id = result[0]
-                cursor.execute("UPDATE players SET last_played = CURRENT_TIMESTAMP WHERE player_id = ?", (player_id,))
-            else:
-                cursor.execute("INSERT INTO players (player_name) VALUES (?)", (player_name,))
-                player_id = cursor.lastrowid
-            conn.commit()
-            return player_id
-        finally:
-            conn.close()
+                return result[0]
+            cursor.execute("INSERT INTO players (player_name) VALUES (?)", (player_name,))
+            return cursor.lastrowid
+        cursor.execute("SELECT player_id FROM players WHERE player_name = ?", (player_name,))
+        result = cursor.fetchone()
+        if result:
+            player_id = result[0]
+            cursor.execute("UPDATE players SET last_played = CURRENT_TIMESTAMP WHERE player_id = ?", (player_id,))
+        else:
+            cursor.execute("INSERT INTO players (player_name) VALUES (?)", (player_name,))
+            player_id = cursor.lastrowid
+        return player_id
 
     def save_game_result(self, player_name: str, guess: int, correct_flow: int,
                         is_correct: int, ek_time_ms: float, dinic_time_ms: float,
                         round_number: int = 1, graph_data: Optional[str] = None):
         """Save a game result using normalized schema."""
-        conn = self._connect()
+        with self._lock:
+            self._write_game_results([(player_name, guess, correct_flow, is_correct,
+                                       ek_time_ms, dinic_time_ms, round_number, graph_data)])
+
+    def enqueue_game_result(self, player_name: str, guess: int, correct_flow: int,
+                            is_correct: int, ek_time_ms: float, dinic_time_ms: float,
+                            round_number: int = 1, graph_data: Optional[str] = None):
+        """Queue a game result for the background writer and return immediately."""
+        with self._writes_done:
+            self._pending_writes += 1
+        self._write_queue.put((player_name, guess, correct_flow, is_correct,
+                               ek_time_ms, dinic_time_ms, round_number, graph_data))
+
+    def _write_game_results(self, results: List[tuple]):
+        """Insert a batch of game results in a single transaction."""
+        conn = self._conn
         cursor = conn.cursor()
         try:
-            player_id = self.get_or_create_player(player_name)
+            cursor.execute("BEGIN IMMEDIATE")
+            for (player_name, guess, correct_flow, is_correct,
+                 ek_time_ms, dinic_time_ms, round_number, graph_data) in results:
+                player_id = self._get_or_create_player(cursor, player_name)
 
-            # Create round entry (store graph_data if provided)
-            cursor.execute("INSERT INTO game_rounds (round_number, graph_data) VALUES (?, ?)",
-                           (round_number, graph_data))
-            round_id = cursor.lastrowid
-
-            # Create game attempt
-            cursor.execute("""
-                INSERT INTO game_attempts (player_id, round_id, guess, correct_flow, is_correct)
-                VALUES (?, ?, ?, ?, ?)
-            """, (player_id, round_id, guess, correct_flow, is_correct))
-            attempt_id = cursor.lastrowid
+                # Create round entry (store graph_data if provided)
+                cursor.execute(_INSERT_ROUND_SQL, (round_number, graph_data))
+                round_id = cursor.lastrowid
 
-            # Save algorithm performances
-            cursor.execute("""
-                INSERT INTO algorithm_performance (attempt_id, algorithm_name, execution_time_ms, flow_result)
-                VALUES (?, 'Edmonds-Karp', ?, ?)
-            """, (attempt_id, ek_time_ms, correct_flow))
+                # Create game attempt
+                cursor.execute(_INSERT_ATTEMPT_SQL, (player_id, round_id, guess, correct_flow, is_correct))
+                attempt_id = cursor.lastrowid
 
-            cursor.execute("""
-                INSERT INTO algorithm_performance (attempt_id, algorithm_name, execution_time_ms, flow_result)
-                VALUES (?, 'Dinic', ?, ?)
-            """, (attempt_id, dinic_time_ms, correct_flow))
+                # Save algorithm performances
+                cursor.executemany(_INSERT_PERFORMANCE_SQL, [
+                    (attempt_id, 'Edmonds-Karp', ek_time_ms, correct_flow),
+                    (attempt_id, 'Dinic', dinic_time_ms, correct_flow),
+                ])
 
             conn.commit()
-            print(f"✓ Game result saved for {player_name}")
-        except sqlite3.Error as e:
-            conn.rollback()
+            for result in results:
+                print(f"✓ Game result saved for {result[0]}")
+        except BaseException as e:
+            # Roll back on any error, not just sqlite3.Error (an int too large
+            # for SQLite raises OverflowError): the connection is shared, and
+            # a transaction left open would make the next BEGIN fail.
+            if conn.in_transaction:
+                conn.rollback()
             print(f"✗ Database save error: {e}")
             raise
-        finally:
-            conn.close()
 
     def get_player_stats(self, player_name: str) -> Dict:
         """Get statistics for a specific player."""
-        conn = self._connect()
-        cursor = conn.cursor()
-        try:
+        self.flush()
+        with self._lock:
+            cursor = self._conn.cursor()
             cursor.execute("""
                 SELECT 
                     p.player_id,
@@ -462,14 +602,12 @@ class DatabaseManager:
                 'avg_ek_time': algo_stats.get('Edmonds-Karp', 0),
                 'avg_dinic_time': algo_stats.get('Dinic', 0)
             }
-        finally:
-            conn.close()
 
     def get_all_game_results(self, limit: int = 100) -> List[Dict]:
         """Get recent game results (joined from normalized tables)."""
-        conn = self._connect()
-        cursor = conn.cursor()
-        try:
+        self.flush()
+        with self._lock:
+            cursor = self._conn.cursor()
             cursor.execute("""
                 SELECT 
                     p.player_name, ga.guess, ga.correct_flow, ga.is_correct,
@@ -500,14 +638,12 @@ class DatabaseManager:
                     'dinicTime': round(algo_data.get('Dinic', 0) or 0, 3)
                 })
             return games
-        finally:
-            conn.close()
 
     def get_leaderboard(self, limit: int = 10) -> List[Dict]:
         """Get top players by win rate."""
-        conn = self._connect()
-        cursor = conn.cursor()
-        try:
+        self.flush()
+        with self._lock:
+            cursor = self._conn.cursor()
             cursor.execute("""
                 SELECT 
                     p.player_name,
@@ -534,6 +670,4 @@ class DatabaseManager:
                     'winRate': round(win_rate, 1),
                     'avgTime': round(row[3], 3) if row[3] else 0
                 })
-            return leaderboard
-        finally:
-            conn.close()
\ No newline at end of file
+            return leaderboard
\ No newline at end of file
@@ -4,15 +4,17 @@ Main API server with CORS support
 """
 from flask import Flask, request, jsonify
 from flask_cors import CORS
+import atexit
 import time
 from algorithms import edmonds_karp_with_flows, dinic, generate_random_capacity_graph
-from database import DatabaseManager
+from database import DatabaseManager, SQLITE_MAX_INT
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for React frontend
 
 # Initialize database
 db = DatabaseManager()
+atexit.register(db.close)
 
 # Store current game state (in production, use sessions or Redis)
 game_state = {
@@ -119,6 +121,12 @@ def submit_guess():
                 'error': 'Guess must be non-negative'
             }), 400
         
+        if guess > SQLITE_MAX_INT:
+            return jsonify({
+                'success': False,
+                'error': 'Guess is too large'
+            }), 400
+        
         # Create graph copies
         graph_ek = {u: dict(vs) for u, vs in game_state['current_graph'].items()}
         graph_dinic = {u: dict(vs) for u, vs in game_state['current_graph'].items()}
@@ -145,8 +153,8 @@ def submit_guess():
         
         is_correct = (guess == correct_flow)
         
-        # Save to database
-        db.save_game_result(
+        # Queue result for the background database writer
+        db.enqueue_game_result(
             player_name=player_name,
             guess=guess,
             correct_flow=correct_flow,
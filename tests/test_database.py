@@ -0,0 +1,90 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from database import DatabaseManager, WRITE_BATCH_SIZE
+
+TOO_BIG = 10**30  # doesn't fit an SQLite INTEGER, so inserting it fails
+
+class TestBackgroundWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmpdir, "test.db")
+        self.db = DatabaseManager(self.db_path)
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.tmpdir)
+
+    def enqueue(self, player, guess=5):
+        self.db.enqueue_game_result(player, guess, 5, int(guess == 5), 0.1, 0.2)
+
+    def stall_writer(self):
+        # Record the players in every batch the writer commits, and hold it
+        # inside the first one until self.release is set so that results
+        # queued meanwhile are drained into the next batch together
+        self.batches = []
+        self.release = threading.Event()
+        entered = threading.Event()
+        write = self.db._write_game_results
+        def record(results):
+            self.batches.append([result[0] for result in results])
+            if len(self.batches) == 1:
+                entered.set()
+                self.release.wait(5)
+            write(results)
+        self.db._write_game_results = record
+
+        self.enqueue("first")
+        self.assertTrue(entered.wait(5))
+
+    def test_enqueued_result_is_visible(self):
+        self.enqueue("alice")
+        stats = self.db.get_player_stats("alice")
+        self.assertEqual(stats['total_games'], 1)
+        self.assertEqual(stats['wins'], 1)
+
+    def test_bad_row_keeps_batch_mates(self):
+        self.stall_writer()
+        self.enqueue("alice")
+        self.enqueue("mallory", TOO_BIG)
+        self.enqueue("bob")
+        self.release.set()
+        self.db.flush()
+
+        # The failing batch was retried one row at a time
+        self.assertEqual(self.batches, [["first"], ["alice", "mallory", "bob"],
+                                        ["alice"], ["mallory"], ["bob"]])
+        self.assertEqual(self.db.get_player_stats("alice")['total_games'], 1)
+        self.assertEqual(self.db.get_player_stats("bob")['total_games'], 1)
+        self.assertEqual(self.db.get_player_stats("mallory")['total_games'], 0)
+
+    def test_writer_survives_failing_row(self):
+        self.enqueue("mallory", TOO_BIG)
+        self.db.flush()
+        self.assertTrue(self.db._writer.is_alive())
+        self.assertFalse(self.db._conn.in_transaction)
+
+        self.enqueue("alice")
+        self.assertEqual(self.db.get_player_stats("alice")['total_games'], 1)
+
+    def test_batches_are_capped(self):
+        self.stall_writer()
+        for _ in range(2 * WRITE_BATCH_SIZE + 1):
+            self.enqueue("alice")
+        self.release.set()
+        self.db.flush()
+
+        sizes = [len(batch) for batch in self.batches]
+        self.assertEqual(sizes, [1, WRITE_BATCH_SIZE, WRITE_BATCH_SIZE, 1])
+
+    def test_close_writes_queued_results(self):
+        for _ in range(3):
+            self.enqueue("alice")
+        self.db.close()
+        self.db = DatabaseManager(self.db_path)
+        self.assertEqual(self.db.get_player_stats("alice")['total_games'], 3)
+
+if __name__ == "__main__":
+    unittest.main()
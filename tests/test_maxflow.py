@@ -1,7 +1,21 @@
 import unittest
-from maxflow import edmonds_karp, dinic
+from algorithms import edmonds_karp, edmonds_karp_scaling, edmonds_karp_with_flows, dinic
 
 class TestMaxFlowAlgorithms(unittest.TestCase):
+    def assertValidFlow(self, g, source, sink, flows):
+        # Every edge carries between 0 and its capacity, and flow is
+        # conserved at every node other than the source and sink
+        net = {u: 0 for u in g}
+        for u in g:
+            for v, capacity in g[u].items():
+                f = flows[(u, v)]
+                self.assertTrue(0 <= f <= capacity, f"{u}->{v} carries {f} of {capacity}")
+                net[u] -= f
+                net[v] += f
+        for u, balance in net.items():
+            if u not in (source, sink):
+                self.assertEqual(balance, 0, f"flow not conserved at {u}")
+
     def test_simple_graph(self):
         # Simple known graph
         g = {
@@ -13,7 +27,7 @@ class TestMaxFlowAlgorithms(unittest.TestCase):
         ek = edmonds_karp(g, "A", "T")
         dn = dinic(g, "A", "T")
         self.assertEqual(ek, dn)
-        self.assertEqual(ek, 4)  # expected max flow is 4
+        self.assertEqual(ek, 5)  # expected max flow is 5 (A->B 3 + A->C 2, all reaching T)
 
     def test_bottleneck(self):
         g = {
@@ -27,5 +41,65 @@ class TestMaxFlowAlgorithms(unittest.TestCase):
         self.assertEqual(ek, dn)
         self.assertEqual(ek, 3)
 
+    def test_flows_cancel_on_reverse_edge(self):
+        # BFS first sends 1 along S->A->B->T; the second path S->C->B->A->D->T
+        # pushes back over B->A, which must cancel the flow on A->B
+        g = {
+            "S":{"A":1, "C":1},
+            "A":{"B":1, "D":1},
+            "B":{"T":1},
+            "C":{"B":1},
+            "D":{"T":1},
+            "T":{}
+        }
+        max_flow, flows = edmonds_karp_with_flows(g, "S", "T")
+        self.assertEqual(max_flow, 2)
+        self.assertEqual(flows[("A", "B")], 0)
+        self.assertValidFlow(g, "S", "T", flows)
+
+    def test_antiparallel_edges(self):
+        # A->B and B->A share one residual pair; A can only pass 1 to T
+        # directly, so the other unit must cross A->B and B->A carries none
+        g = {
+            "S":{"A":2, "B":2},
+            "A":{"B":3, "T":1},
+            "B":{"A":1, "T":3},
+            "T":{}
+        }
+        max_flow, flows = edmonds_karp_with_flows(g, "S", "T")
+        self.assertEqual(max_flow, 4)
+        self.assertEqual(max_flow, dinic(g, "S", "T"))
+        self.assertEqual(flows[("A", "B")], 1)
+        self.assertEqual(flows[("B", "A")], 0)
+        self.assertValidFlow(g, "S", "T", flows)
+
+    def test_scaling_matches(self):
+        g = {
+            "A":{"B":100, "C":1},
+            "B":{"C":100, "T":1},
+            "C":{"T":100},
+            "T":{}
+        }
+        self.assertEqual(edmonds_karp_scaling(g, "A", "T"), edmonds_karp(g, "A", "T"))
+        self.assertEqual(edmonds_karp_scaling(g, "A", "T"), 101)
+
+    def test_fractional_capacities(self):
+        g = {
+            "A":{"B":0.5, "T":0.25},
+            "B":{"T":0.75},
+            "T":{}
+        }
+        ek = edmonds_karp(g, "A", "T")
+        self.assertEqual(ek, dinic(g, "A", "T"))
+        self.assertEqual(edmonds_karp_with_flows(g, "A", "T")[0], ek)
+        self.assertEqual(ek, 0.75)
+
+    def test_source_is_sink(self):
+        g = {"A":{"B":5}, "B":{"A":5}}
+        self.assertEqual(edmonds_karp(g, "A", "A"), 0)
+        self.assertEqual(edmonds_karp_scaling(g, "A", "A"), 0)
+        self.assertEqual(edmonds_karp_with_flows(g, "A", "A")[0], 0)
+        self.assertEqual(dinic(g, "A", "A"), 0)
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file